@@ -0,0 +1,356 @@
+import argparse
+import csv
+import io
+import itertools
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from insta_to_postgres import PostgresDatabase
+from utils import setup_logging
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+COLUMNS = ("id", "caption", "image_url", "created_at")
+IMPORT_COLUMNS = ("caption", "image_url", "created_at")
+FORMATS = ("csv", "ndjson", "parquet")
+# CSV marker for NULL, so that empty strings survive a round trip (caption is UNIQUE, NULLs are not)
+NULL_MARKER = "\\N"
+
+
+class BulkTransfer:
+    """
+    Streams the instagram_posts table to and from CSV, NDJSON and Parquet files.
+
+    Exports and imports work in fixed-size chunks so memory use stays constant
+    regardless of table size. After each chunk the progress is written to an
+    optional checkpoint file, and a rerun with the same checkpoint resumes from there.
+
+    Attributes:
+        db (PostgresDatabase): Open database connection, also ensures the table exists.
+        chunk_size (int): Number of rows moved per chunk.
+    """
+
+    def __init__(self, db, chunk_size=10000):
+        self.db = db
+        self.connection = db.connection
+        self.chunk_size = chunk_size
+        self.logger = logging.getLogger(__name__)
+
+    def _time_filter(self, since=None, until=None):
+        """Builds an SQL fragment restricting created_at to [since, until)."""
+        clauses = []
+        with self.connection.cursor() as cursor:
+            if since:
+                clauses.append(cursor.mogrify("AND created_at >= %s", (since,)).decode())
+            if until:
+                clauses.append(cursor.mogrify("AND created_at < %s", (until,)).decode())
+        return " ".join(clauses)
+
+    def _read_checkpoint(self, checkpoint, params):
+        """
+        Returns the saved progress for this run, or an empty dict when starting fresh.
+        Refuses to resume a checkpoint written for a different file, format or filter.
+        """
+        if not checkpoint or not os.path.exists(checkpoint):
+            return {}
+        with open(checkpoint) as f:
+            state = json.load(f)
+        for key, value in params.items():
+            if state.get(key) != value:
+                raise ValueError(
+                    f"Checkpoint {checkpoint} was written with {key}={state.get(key)!r}, not {value!r}. "
+                    "Use a new checkpoint file or rerun with the original arguments."
+                )
+        return state
+
+    def _write_checkpoint(self, checkpoint, state):
+        if not checkpoint:
+            return
+        tmp = f"{checkpoint}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, checkpoint)
+
+    def export_posts(self, path, fmt="csv", since=None, until=None, checkpoint=None):
+        """Exports rows ordered by id; returns the number of rows written."""
+        params = {"path": os.path.abspath(path), "format": fmt, "since": since, "until": until}
+        state = self._read_checkpoint(checkpoint, params)
+        if state and fmt == "parquet":
+            raise ValueError("Resuming is not supported for Parquet exports.")
+        if fmt == "parquet" and pq is None:
+            raise ImportError("Parquet export requires the 'pyarrow' package.")
+
+        time_filter = self._time_filter(since, until)
+        if fmt == "parquet":
+            return self._export_parquet(path, time_filter)
+
+        last_id = state.get("last_id", 0)
+        newline = "" if fmt == "csv" else None
+        if state:
+            # Drop anything written after the last checkpoint (a partial or repeated chunk)
+            self.logger.info("Resuming export after id %d.", last_id)
+            f = open(path, "r+", newline=newline, encoding="utf-8")
+            f.truncate(state["offset"])
+            f.seek(state["offset"])
+        else:
+            f = open(path, "w", newline=newline, encoding="utf-8")
+
+        with f:
+            if fmt == "csv":
+                return self._export_csv(f, last_id, time_filter, checkpoint, params, header=not state)
+            return self._export_ndjson(f, last_id, time_filter, checkpoint, params)
+
+    def _export_csv(self, f, last_id, time_filter, checkpoint, params, header=True):
+        """Streams each id range with COPY ... TO STDOUT straight into the file."""
+        total = 0
+        with self.connection.cursor() as cursor:
+            while True:
+                cursor.execute(f"""
+                    SELECT max(id), count(*) FROM (
+                        SELECT id FROM instagram_posts
+                        WHERE id > %s {time_filter}
+                        ORDER BY id LIMIT %s
+                    ) chunk;
+                """, (last_id, self.chunk_size))
+                chunk_end, count = cursor.fetchone()
+                if chunk_end is None:
+                    break
+
+                query = cursor.mogrify(f"""
+                    SELECT {", ".join(COLUMNS)} FROM instagram_posts
+                    WHERE id > %s AND id <= %s {time_filter}
+                    ORDER BY id
+                """, (last_id, chunk_end)).decode()
+                options = f"FORMAT csv, NULL '{NULL_MARKER}'" + (", HEADER" if header else "")
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH ({options})", f)
+                f.flush()
+                header = False
+
+                last_id = chunk_end
+                total += count
+                self._write_checkpoint(checkpoint, dict(params, last_id=last_id, offset=f.tell()))
+                self.logger.info("Exported %d rows (last id %d).", total, last_id)
+        self.connection.commit()
+        return total
+
+    def _iter_rows(self, last_id, time_filter):
+        """Yields lists of row dicts from a server-side (named) cursor."""
+        with self.connection.cursor(name="instagram_posts_export") as cursor:
+            cursor.itersize = self.chunk_size
+            cursor.execute(f"""
+                SELECT {", ".join(COLUMNS)} FROM instagram_posts
+                WHERE id > %s {time_filter}
+                ORDER BY id;
+            """, (last_id,))
+            while True:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                yield [dict(zip(COLUMNS, row)) for row in rows]
+        self.connection.commit()
+
+    def _export_ndjson(self, f, last_id, time_filter, checkpoint, params):
+        total = 0
+        for rows in self._iter_rows(last_id, time_filter):
+            for row in rows:
+                if row["created_at"] is not None:
+                    row["created_at"] = row["created_at"].isoformat()
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+
+            total += len(rows)
+            self._write_checkpoint(checkpoint, dict(params, last_id=rows[-1]["id"], offset=f.tell()))
+            self.logger.info("Exported %d rows (last id %d).", total, rows[-1]["id"])
+        return total
+
+    def _export_parquet(self, path, time_filter):
+        schema = pa.schema([
+            ("id", pa.int32()),
+            ("caption", pa.string()),
+            ("image_url", pa.string()),
+            ("created_at", pa.timestamp("us")),
+        ])
+        total = 0
+        with pq.ParquetWriter(path, schema) as writer:
+            for rows in self._iter_rows(0, time_filter):
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                total += len(rows)
+                self.logger.info("Exported %d rows.", total)
+        return total
+
+    def _read_records(self, path, fmt):
+        """Yields (caption, image_url, created_at) tuples one at a time from a file."""
+        if fmt == "csv":
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    values = [row.get(column) for column in IMPORT_COLUMNS]
+                    values = [None if value == NULL_MARKER else value for value in values]
+                    # A blank timestamp cannot be cast, so treat it as missing
+                    values[2] = values[2] or None
+                    yield tuple(values)
+        elif fmt == "ndjson":
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        row = json.loads(line)
+                        yield tuple(row.get(column) for column in IMPORT_COLUMNS)
+        else:
+            if pq is None:
+                raise ImportError("Parquet import requires the 'pyarrow' package.")
+            for batch in pq.ParquetFile(path).iter_batches(batch_size=self.chunk_size, columns=list(IMPORT_COLUMNS)):
+                for row in batch.to_pylist():
+                    yield tuple(row[column] for column in IMPORT_COLUMNS)
+
+    def _copy_chunk(self, cursor, records, table="instagram_posts", staging="instagram_posts_staging"):
+        """COPYs one chunk into the staging table and moves new captions into the target table."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for record in records:
+            writer.writerow([NULL_MARKER if value is None else value for value in record])
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {staging} ({', '.join(IMPORT_COLUMNS)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL_MARKER}')", buffer
+        )
+        cursor.execute(f"""
+            INSERT INTO {table} (caption, image_url, created_at)
+            SELECT caption, image_url, COALESCE(created_at, CURRENT_TIMESTAMP) FROM {staging}
+            ON CONFLICT (caption) DO NOTHING;
+        """)
+        inserted = cursor.rowcount
+        cursor.execute(f"TRUNCATE {staging};")
+        return inserted
+
+    def _create_staging_table(self, cursor, staging="instagram_posts_staging"):
+        cursor.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {staging} (
+                caption TEXT,
+                image_url TEXT,
+                created_at TIMESTAMP
+            );
+        """)
+
+    def import_posts(self, path, fmt="csv", checkpoint=None):
+        """Imports rows in chunks, skipping captions that already exist; returns rows inserted."""
+        params = {"path": os.path.abspath(path), "format": fmt}
+        done = self._read_checkpoint(checkpoint, params).get("rows", 0)
+        if done:
+            self.logger.info("Resuming import after %d rows.", done)
+
+        records = itertools.islice(self._read_records(path, fmt), done, None)
+        inserted = 0
+        with self.connection.cursor() as cursor:
+            self._create_staging_table(cursor)
+            while True:
+                chunk = list(itertools.islice(records, self.chunk_size))
+                if not chunk:
+                    break
+                inserted += self._copy_chunk(cursor, chunk)
+                self.connection.commit()
+
+                done += len(chunk)
+                self._write_checkpoint(checkpoint, dict(params, rows=done))
+                self.logger.info("Imported %d rows (%d new).", done, inserted)
+        return inserted
+
+    def benchmark(self, rows=10000):
+        """
+        Compares row-wise inserts (as done by insert_post_data) with chunked COPY
+        on temporary tables, and returns the throughput of each in rows per second.
+        """
+        if rows <= 0:
+            raise ValueError("The benchmark needs at least one row.")
+        stamp = datetime.now().isoformat()
+        records = [(f"Benchmark caption {i} {stamp}", f"https://example.com/{i}.jpg", None) for i in range(rows)]
+        results = {}
+
+        with self.connection.cursor() as cursor:
+            for table in ("bench_rowwise", "bench_copy"):
+                cursor.execute(f"""
+                    CREATE TEMP TABLE IF NOT EXISTS {table} (
+                        id SERIAL PRIMARY KEY,
+                        caption TEXT UNIQUE,
+                        image_url TEXT,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
+                """)
+            self._create_staging_table(cursor, "bench_staging")
+            self.connection.commit()
+
+            start = time.perf_counter()
+            for caption, image_url, _ in records:
+                cursor.execute("SELECT id FROM bench_rowwise WHERE caption = %s", (caption,))
+                if cursor.fetchone() is None:
+                    cursor.execute("INSERT INTO bench_rowwise (caption, image_url) VALUES (%s, %s);", (caption, image_url))
+                self.connection.commit()
+            results["rowwise"] = rows / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for i in range(0, rows, self.chunk_size):
+                self._copy_chunk(cursor, records[i:i + self.chunk_size], "bench_copy", "bench_staging")
+                self.connection.commit()
+            results["copy"] = rows / (time.perf_counter() - start)
+
+            cursor.execute("DROP TABLE bench_rowwise, bench_copy, bench_staging;")
+            self.connection.commit()
+
+        self.logger.info("Row-wise: %.0f rows/s, COPY: %.0f rows/s (%.1fx).",
+                         results["rowwise"], results["copy"], results["copy"] / results["rowwise"])
+        return results
+
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk export and import for the instagram_posts table.")
+    parser.add_argument("--chunk-size", type=positive_int, default=10000, help="Rows per chunk (default: 10000).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="Export posts to a file.")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=FORMATS, default="csv")
+    export_parser.add_argument("--since", help="Only posts created at or after this timestamp.")
+    export_parser.add_argument("--until", help="Only posts created before this timestamp.")
+    export_parser.add_argument("--checkpoint", help="Progress file used to resume an interrupted export.")
+
+    import_parser = subparsers.add_parser("import", help="Import posts from a file.")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=FORMATS, default="csv")
+    import_parser.add_argument("--checkpoint", help="Progress file used to resume an interrupted import.")
+
+    benchmark_parser = subparsers.add_parser("benchmark", help="Compare row-wise inserts with COPY.")
+    benchmark_parser.add_argument("--rows", type=positive_int, default=10000)
+
+    args = parser.parse_args()
+
+    setup_logging()
+    db = PostgresDatabase()
+    transfer = BulkTransfer(db, chunk_size=args.chunk_size)
+    try:
+        if args.command == "export":
+            total = transfer.export_posts(args.path, args.format, args.since, args.until, args.checkpoint)
+            print(f"Exported {total} rows to {args.path}")
+        elif args.command == "import":
+            total = transfer.import_posts(args.path, args.format, args.checkpoint)
+            print(f"Imported {total} new rows from {args.path}")
+        else:
+            results = transfer.benchmark(args.rows)
+            print(f"Row-wise inserts: {results['rowwise']:.0f} rows/s")
+            print(f"COPY:             {results['copy']:.0f} rows/s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
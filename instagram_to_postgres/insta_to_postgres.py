@@ -26,7 +26,7 @@ class PostgresDatabase:
             self.cursor = self.connection.cursor()
             self.logger.info("Connected to PostgreSQL database.")
         except Exception as e:
-            self.logger.error(f"Error connecting to PostgreSQL: {e}")
+            self.logger.error("Error connecting to PostgreSQL: %s", e)
             raise
 
     def create_table_if_not_exists(self):
@@ -43,7 +43,7 @@ class PostgresDatabase:
             self.connection.commit()
             self.logger.info("Ensured 'instagram_posts' table exists.")
         except Exception as e:
-            self.logger.error(f"Error creating table: {e}")
+            self.logger.error("Error creating table: %s", e)
             raise
 
     def check_if_caption_exists(self, caption):
@@ -51,7 +51,7 @@ class PostgresDatabase:
             self.cursor.execute("SELECT id FROM instagram_posts WHERE caption = %s", (caption,))
             return self.cursor.fetchone() is not None
         except Exception as e:
-            self.logger.error(f"Error checking caption existence: {e}")
+            self.logger.error("Error checking caption existence: %s", e)
             raise
 
     def insert_post_data(self, caption, image_url):
@@ -68,14 +68,14 @@ class PostgresDatabase:
             self.connection.commit()
             self.logger.info("Successfully stored post in PostgreSQL.")
         except Exception as e:
-            self.logger.error(f"Error inserting post data: {e}")
+            self.logger.error("Error inserting post data: %s", e)
             raise
 
     def store_data_in_postgres(self, caption, image_url):
         try:
             self.insert_post_data(caption, image_url)
         except Exception as e:
-            self.logger.error(f"Error during storing data: {e}")
+            self.logger.error("Error during storing data: %s", e)
 
     def close(self):
         try:
@@ -85,7 +85,7 @@ class PostgresDatabase:
                 self.connection.close()
             self.logger.info("Closed PostgreSQL connection.")
         except Exception as e:
-            self.logger.error(f"Error closing connection: {e}")
+            self.logger.error("Error closing connection: %s", e)
 
 
 def main():
@@ -6,7 +6,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from config import tokens
 from insta_to_postgres import PostgresDatabase
-from utils import setup_logging
+from utils import setup_logging, log_context
 
 
 # Setup logging
@@ -31,7 +31,7 @@ class InstagramScraper:
             driver.maximize_window()
             return driver
         except Exception as e:
-            logger.error(f"Error setting up WebDriver: {e}")
+            logger.error("Error setting up WebDriver: %s", e)
             raise
 
     def close_popup(self, xpath):
@@ -41,9 +41,9 @@ class InstagramScraper:
                 EC.element_to_be_clickable((By.XPATH, xpath))
             )
             popup_button.click()
-            logger.info(f"Closed popup with xpath: {xpath}")
+            logger.info("Closed popup with xpath: %s", xpath)
         except Exception as e:
-            logger.info(f"No popup found or failed to interact: {e}")
+            logger.info("No popup found or failed to interact: %s", e)
         '''
         try:
             WebDriverWait(self.driver, 5).until(EC.element_to_be_clickable((By.XPATH, xpath))).click()
@@ -70,7 +70,7 @@ class InstagramScraper:
 
             self.close_popup("//button[contains(text(), 'Not Now')]")
         except Exception as e:
-            logger.error(f"Error during login: {e}")
+            logger.error("Error during login: %s", e)
             self.driver.quit()
             raise
 
@@ -78,12 +78,12 @@ class InstagramScraper:
         """Navigate to a specified Instagram profile."""
         try:
             self.driver.get(profile_url)
-            logger.info(f"Navigating to profile: {profile_url}")
+            logger.info("Navigating to profile: %s", profile_url)
             WebDriverWait(self.driver, 10).until(
                 EC.presence_of_element_located((By.XPATH, "//a[contains(@href, '/p/')]"))
             )
         except Exception as e:
-            logger.error(f"Error navigating to profile: {e}")
+            logger.error("Error navigating to profile: %s", e)
             self.driver.quit()
             raise
 
@@ -92,10 +92,10 @@ class InstagramScraper:
         try:
             posts = self.driver.find_elements(By.XPATH, "//a[contains(@href, '/p/')]")
             post_urls = [post.get_attribute("href") for post in posts]
-            logger.info(f"Fetched {len(post_urls)} posts.")
+            logger.info("Fetched %s posts.", len(post_urls))
             return post_urls
         except Exception as e:
-            logger.error(f"Error fetching post URLs: {e}")
+            logger.error("Error fetching post URLs: %s", e)
             return []
 
     def extract_caption(self):
@@ -106,7 +106,7 @@ class InstagramScraper:
             )).text
             return caption
         except Exception as e:
-            logger.error(f"Error extracting caption: {e}")
+            logger.error("Error extracting caption: %s", e)
             return None
 
     def extract_image_url(self):
@@ -117,7 +117,7 @@ class InstagramScraper:
             )).get_attribute("src")
             return image_url
         except Exception as e:
-            logger.error(f"Error extracting image URL: {e}")
+            logger.error("Error extracting image URL: %s", e)
             return None
 
     def scrape_posts(self, profile_url, limit=5):
@@ -130,14 +130,16 @@ class InstagramScraper:
             db = PostgresDatabase()
 
             for i, post_url in enumerate(post_urls[:limit]):
-                logger.info(f"Processing post {i + 1} URL: {post_url}")
-                self.driver.get(post_url)
+                # Tag every log line for this post with the same correlation ID
+                with log_context():
+                    logger.info("Processing post %s URL: %s", i + 1, post_url)
+                    self.driver.get(post_url)
 
-                caption = self.extract_caption()
-                image_url = self.extract_image_url()
+                    caption = self.extract_caption()
+                    image_url = self.extract_image_url()
 
-                if caption and image_url:
-                    db.store_data_in_postgres(caption, image_url)
+                    if caption and image_url:
+                        db.store_data_in_postgres(caption, image_url)
 
                 logger.info("-" * 40)
 
@@ -0,0 +1,169 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock
+from bulk_transfer import BulkTransfer
+
+class TestBulkTransfer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a BulkTransfer on a mocked connection and a temporary directory."""
+        self.db = MagicMock()
+        self.cursor = self.db.connection.cursor.return_value.__enter__.return_value
+        self.cursor.rowcount = 2
+        self.cursor.mogrify.side_effect = lambda sql, args: (sql % tuple(f"'{arg}'" for arg in args)).encode()
+        self.transfer = BulkTransfer(self.db, chunk_size=2)
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "posts.ndjson")
+        with open(self.path, "w") as f:
+            for i in range(5):
+                f.write(json.dumps({"id": i, "caption": f"Caption {i}", "image_url": f"https://image.url/{i}.jpg"}) + "\n")
+        self.csv_path = os.path.join(self.tmpdir.name, "posts.csv")
+        self.checkpoint = os.path.join(self.tmpdir.name, "checkpoint.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def copied_rows(self):
+        return [call.args[1].getvalue() for call in self.cursor.copy_expert.call_args_list]
+
+    def read_checkpoint(self):
+        with open(self.checkpoint) as f:
+            return json.load(f)
+
+    def mock_copy_export(self, chunk_ends):
+        """Makes each COPY ... TO STDOUT write one CSV line per id in its chunk."""
+        self.cursor.fetchone.side_effect = [(end, 2) for end in chunk_ends] + [(None, 0)]
+
+        def copy_expert(sql, f):
+            if "HEADER" in sql:
+                f.write("id,caption,image_url,created_at\n")
+            end = chunk_ends[self.cursor.copy_expert.call_count - 1]
+            for i in (end - 1, end):
+                f.write(f"{i},Caption {i},https://image.url/{i}.jpg,2025-04-25 10:00:00\n")
+
+        self.cursor.copy_expert.side_effect = copy_expert
+
+    def test_import_posts_in_chunks(self):
+        """Test an import is copied in chunk-sized pieces and checkpointed after each."""
+        self.transfer.import_posts(self.path, "ndjson", checkpoint=self.checkpoint)
+
+        self.assertEqual(self.cursor.copy_expert.call_count, 3)
+        self.assertEqual(self.db.connection.commit.call_count, 3)
+        self.assertIn("Caption 4", self.copied_rows()[-1])
+        self.assertEqual(self.read_checkpoint(), {"path": self.path, "format": "ndjson", "rows": 5})
+
+    def test_import_posts_resumes_from_checkpoint(self):
+        """Test a resumed import skips the rows recorded in the checkpoint."""
+        with open(self.checkpoint, "w") as f:
+            json.dump({"path": self.path, "format": "ndjson", "rows": 4}, f)
+
+        self.transfer.import_posts(self.path, "ndjson", checkpoint=self.checkpoint)
+
+        self.assertEqual(self.cursor.copy_expert.call_count, 1)
+        self.assertEqual(self.copied_rows(), ["Caption 4,https://image.url/4.jpg,\\N\r\n"])
+
+    def test_import_csv_keeps_empty_strings_apart_from_null(self):
+        """Test only the NULL marker becomes NULL, so an empty caption stays a (unique) empty string."""
+        with open(self.csv_path, "w", newline="") as f:
+            f.write('id,caption,image_url,created_at\n1,"",\\N,\\N\n2,Caption 2,,\n')
+
+        self.transfer.import_posts(self.csv_path, "csv")
+
+        # With NULL '\N', an unquoted empty field is loaded as '' rather than NULL
+        self.assertEqual(self.copied_rows(), [',\\N,\\N\r\nCaption 2,,\\N\r\n'])
+        self.assertIn("NULL '\\N'", self.cursor.copy_expert.call_args.args[0])
+
+    def test_benchmark_rejects_zero_rows(self):
+        """Test the benchmark refuses to run without rows instead of dividing by zero."""
+        with self.assertRaises(ValueError):
+            self.transfer.benchmark(rows=0)
+        self.cursor.execute.assert_not_called()
+
+    def test_export_csv_uses_copy_in_chunks(self):
+        """Test a CSV export streams each id range with COPY TO STDOUT and writes one header."""
+        self.mock_copy_export([2, 4])
+
+        total = self.transfer.export_posts(self.csv_path, "csv", since="2025-04-01", until="2025-05-01",
+                                           checkpoint=self.checkpoint)
+
+        sql = [call.args[0] for call in self.cursor.copy_expert.call_args_list]
+        self.assertEqual(total, 4)
+        self.assertTrue(all("TO STDOUT" in statement and "NULL '\\N'" in statement for statement in sql))
+        self.assertIn("HEADER", sql[0])
+        self.assertNotIn("HEADER", sql[1])
+        self.assertIn("AND created_at >= '2025-04-01' AND created_at < '2025-05-01'", sql[1])
+        self.assertIn("id > '2' AND id <= '4'", sql[1])
+
+        with open(self.csv_path) as f:
+            content = f.read()
+        self.assertEqual(content.count("id,caption"), 1)
+        self.assertEqual(self.read_checkpoint(), {
+            "path": self.csv_path, "format": "csv", "since": "2025-04-01", "until": "2025-05-01",
+            "last_id": 4, "offset": len(content),
+        })
+
+    def test_export_csv_resume_truncates_partial_chunk(self):
+        """Test a resumed CSV export drops data written after the checkpoint and adds no header."""
+        complete = "id,caption,image_url,created_at\n1,Caption 1,https://image.url/1.jpg,2025-04-25 10:00:00\n"
+        with open(self.csv_path, "w") as f:
+            f.write(complete + "3,Caption 3,https://ima")
+        with open(self.checkpoint, "w") as f:
+            json.dump({"path": self.csv_path, "format": "csv", "since": None, "until": None,
+                       "last_id": 1, "offset": len(complete)}, f)
+        self.mock_copy_export([3])
+
+        self.transfer.export_posts(self.csv_path, "csv", checkpoint=self.checkpoint)
+
+        self.assertEqual(self.cursor.execute.call_args_list[0].args[1], (1, 2))
+        self.assertNotIn("HEADER", self.cursor.copy_expert.call_args.args[0])
+        with open(self.csv_path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([line.split(",")[0] for line in lines], ["id", "1", "2", "3"])
+
+    def test_export_refuses_checkpoint_with_other_arguments(self):
+        """Test a checkpoint cannot be resumed with a different filter."""
+        with open(self.checkpoint, "w") as f:
+            json.dump({"path": self.csv_path, "format": "csv", "since": "2025-01-01", "until": None,
+                       "last_id": 1, "offset": 0}, f)
+
+        with self.assertRaises(ValueError):
+            self.transfer.export_posts(self.csv_path, "csv", since="2025-04-01", checkpoint=self.checkpoint)
+        self.cursor.copy_expert.assert_not_called()
+
+    def test_export_ndjson_uses_server_side_cursor(self):
+        """Test an NDJSON export reads from a named cursor and checkpoints each chunk."""
+        created_at = datetime(2025, 4, 25, 10, 0)
+        self.cursor.fetchmany.side_effect = [
+            [(1, "Caption 1", "https://image.url/1.jpg", created_at), (2, "Caption 2", "https://image.url/2.jpg", None)],
+            [(3, "Caption 3", "https://image.url/3.jpg", created_at)],
+            [],
+        ]
+        out = os.path.join(self.tmpdir.name, "export.ndjson")
+
+        total = self.transfer.export_posts(out, "ndjson", checkpoint=self.checkpoint)
+
+        self.db.connection.cursor.assert_any_call(name="instagram_posts_export")
+        self.assertEqual(self.cursor.itersize, 2)
+        with open(out) as f:
+            rows = [json.loads(line) for line in f]
+        self.assertEqual(total, 3)
+        self.assertEqual([row["id"] for row in rows], [1, 2, 3])
+        self.assertEqual(rows[0]["created_at"], "2025-04-25T10:00:00")
+        self.assertEqual(self.read_checkpoint()["last_id"], 3)
+        self.assertEqual(self.read_checkpoint()["offset"], os.path.getsize(out))
+
+    def test_export_parquet_cannot_resume(self):
+        """Test a Parquet export refuses to resume from a checkpoint."""
+        parquet_path = os.path.join(self.tmpdir.name, "posts.parquet")
+        with open(self.checkpoint, "w") as f:
+            json.dump({"path": parquet_path, "format": "parquet", "since": None, "until": None, "last_id": 10}, f)
+
+        with self.assertRaises(ValueError):
+            self.transfer.export_posts(parquet_path, "parquet", checkpoint=self.checkpoint)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import json
+import logging
+import os
+import queue
+import tempfile
+import time
+import unittest
+from datetime import date, timedelta
+from logging.handlers import QueueListener
+from unittest.mock import patch
+import utils
+from utils import CorrelationIdFilter, DailyFileHandler, JsonFormatter, log_context, setup_logging
+
+class TestLogging(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a temporary log directory."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_dir = self.tmpdir.name
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def make_record(self, message, created=None):
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+        if created is not None:
+            record.created = created
+        CorrelationIdFilter().filter(record)
+        return record
+
+    def test_daily_file_handler_switches_file_at_midnight(self):
+        """Test records from the next day go to the next day's log file."""
+        handler = DailyFileHandler(self.log_dir)
+        tomorrow = date.today() + timedelta(days=1)
+
+        handler.emit(self.make_record("today"))
+        handler.emit(self.make_record("tomorrow", time.mktime(tomorrow.timetuple())))
+        handler.close()
+
+        with open(os.path.join(self.log_dir, f"log_{tomorrow.strftime('%Y-%m-%d')}.log")) as f:
+            self.assertEqual(f.read().strip(), "tomorrow")
+
+    def test_daily_file_handler_deletes_old_logs(self):
+        """Test log files older than the retention period are deleted."""
+        old_day = date.today() - timedelta(days=30)
+        old_log = os.path.join(self.log_dir, f"log_{old_day.strftime('%Y-%m-%d')}.log")
+        open(old_log, "w").close()
+
+        DailyFileHandler(self.log_dir, retention_days=14).close()
+
+        self.assertFalse(os.path.exists(old_log))
+
+    def test_daily_file_handler_ignores_concurrently_deleted_logs(self):
+        """Test pruning tolerates another service deleting the same old log first."""
+        old_day = date.today() - timedelta(days=30)
+        open(os.path.join(self.log_dir, f"log_{old_day.strftime('%Y-%m-%d')}.log"), "w").close()
+        tomorrow = date.today() + timedelta(days=1)
+
+        with patch("utils.os.remove", side_effect=FileNotFoundError):
+            handler = DailyFileHandler(self.log_dir)
+            handler.emit(self.make_record("tomorrow", time.mktime(tomorrow.timetuple())))
+        handler.close()
+
+        with open(os.path.join(self.log_dir, f"log_{tomorrow.strftime('%Y-%m-%d')}.log")) as f:
+            self.assertEqual(f.read().strip(), "tomorrow")
+
+    def test_rollover_error_does_not_stop_listener(self):
+        """Test a failing rollover is reported by handleError and the listener keeps running."""
+        handler = DailyFileHandler(self.log_dir)
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, handler)
+        listener.start()
+        tomorrow = time.mktime((date.today() + timedelta(days=1)).timetuple())
+
+        with patch.object(handler, "_rollover", side_effect=OSError("disk gone")), \
+                patch.object(handler, "handleError") as handle_error:
+            log_queue.put(self.make_record("lost", tomorrow))
+            log_queue.put(self.make_record("kept"))
+            listener.stop()
+
+        handle_error.assert_called_once()
+        handler.close()
+        with open(os.path.join(self.log_dir, f"log_{date.today().strftime('%Y-%m-%d')}.log")) as f:
+            self.assertEqual(f.read().strip(), "kept")
+
+    def test_json_formatter_includes_correlation_id(self):
+        """Test JSON output carries the correlation ID set by log_context."""
+        with log_context("post-1"):
+            record = self.make_record("Processing post")
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual(entry["correlation_id"], "post-1")
+        self.assertEqual(entry["message"], "Processing post")
+        self.assertEqual(self.make_record("outside").correlation_id, "-")
+
+    def log_exception_through_listener(self, json_format):
+        """Logs an exception via setup_logging and returns the log file contents."""
+        root = logging.getLogger()
+        handlers, level = root.handlers[:], root.level
+        with patch.object(utils, "_listener", None), patch("atexit.register"), patch("sys.stderr"):
+            setup_logging(self.log_dir, json_format=json_format)
+            try:
+                with log_context("post-1"):
+                    try:
+                        1 / 0
+                    except ZeroDivisionError:
+                        logging.exception("boom %s", "post")
+            finally:
+                utils._listener.stop()
+                for handler in utils._listener.handlers:
+                    handler.close()
+                root.handlers[:] = handlers
+                root.setLevel(level)
+
+        with open(os.path.join(self.log_dir, f"log_{date.today().strftime('%Y-%m-%d')}.log")) as f:
+            return f.read()
+
+    def test_json_output_keeps_exception_separate(self):
+        """Test a traceback logged through the queue ends up in its own JSON field."""
+        entries = [json.loads(line) for line in self.log_exception_through_listener(True).splitlines()]
+        entry = next(entry for entry in entries if entry["level"] == "ERROR")
+
+        self.assertEqual(entry["message"], "boom post")
+        self.assertEqual(entry["correlation_id"], "post-1")
+        self.assertIn("ZeroDivisionError", entry["exception"])
+
+    def test_text_output_keeps_traceback(self):
+        """Test the text format still prints the traceback after the message."""
+        content = self.log_exception_through_listener(False)
+
+        self.assertIn("[post-1] boom post\nTraceback", content)
+        self.assertIn("ZeroDivisionError", content)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,7 @@ import logging
 from PIL import Image
 from io import BytesIO
 from summarizer import InstagramCaptionSummarizer
-from utils import setup_logging
+from utils import setup_logging, log_context
 
 class StreamlitApp:
     """
@@ -43,7 +43,7 @@ class StreamlitApp:
                     logging.info("Image displayed successfully.")
                 except Exception as e:
                     st.error(f"Error loading image: {e}")
-                    logging.error(f"Error loading image: {e}")
+                    logging.error("Error loading image: %s", e)
 
             # Display the Instagram caption if available
             if caption:
@@ -56,7 +56,7 @@ class StreamlitApp:
             return caption, image_url
         except Exception as e:
             st.error("Error fetching Instagram post.")
-            logging.error(f"Error fetching Instagram post: {e}")
+            logging.error("Error fetching Instagram post: %s", e)
             return None, None
 
     def run(self):
@@ -87,7 +87,7 @@ class StreamlitApp:
                         st.session_state.summarized_tweet = self.summarizer.summarize_caption(caption)
                         logging.info("Caption summarized successfully.")
                     except Exception as e:
-                        logging.error(f"Error summarizing caption: {e}")
+                        logging.error("Error summarizing caption: %s", e)
 
                 # Display the summary if generated successfully
                 if st.session_state.summarized_tweet:
@@ -121,7 +121,7 @@ class StreamlitApp:
                             logging.error("Failed to post tweet with image.")
                     except Exception as e:
                         st.error("Error posting tweet with image.")
-                        logging.error(f"Error posting tweet with image: {e}")
+                        logging.error("Error posting tweet with image: %s", e)
 
             with col2:
                 # Button to post tweet without image
@@ -137,9 +137,11 @@ class StreamlitApp:
                             logging.error("Failed to post tweet without image.")
                     except Exception as e:
                         st.error("Error posting tweet without image.")
-                        logging.error(f"Error posting tweet without image: {e}")
+                        logging.error("Error posting tweet without image: %s", e)
 
 if __name__ == "__main__":
-    # Instantiate and run the Streamlit app
-    app = StreamlitApp()
-    app.run()
+    # Streamlit reruns the script on every interaction, so each run gets its own correlation ID
+    with log_context():
+        # Instantiate and run the Streamlit app
+        app = StreamlitApp()
+        app.run()
@@ -0,0 +1,28 @@
+import requests
+
+
+class InferenceClient:
+    """
+    Thin HTTP client for the shared summarization server in inference_server.py.
+
+    Attributes:
+        base_url (str): Server address, e.g. "http://summarizer:8000".
+        timeout (float): Seconds to wait for a summary before giving up.
+    """
+
+    def __init__(self, base_url, timeout=120):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def summarize(self, caption):
+        """Returns the raw model summary for a caption; raises on HTTP errors."""
+        response = self.session.post(f"{self.base_url}/summarize", json={"caption": caption}, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["summary"]
+
+    def metrics(self):
+        """Returns the server's queue depth and batch-size counters."""
+        response = self.session.get(f"{self.base_url}/metrics", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
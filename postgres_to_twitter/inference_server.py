@@ -0,0 +1,252 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from transformers import AutoModelForSeq2SeqLM, PegasusTokenizer
+from utils import setup_logging
+
+MODEL_NAME = "google/pegasus-cnn_dailymail"
+MAX_BODY_SIZE = 1024 * 1024  # Far above any caption; the tokenizer truncates at 1024 tokens anyway
+
+
+class QueueFullError(Exception):
+    """Raised when the request queue is full and a new request is shed."""
+
+
+class _PendingRequest:
+    """A single caption waiting in the queue, plus the event its caller waits on."""
+
+    def __init__(self, caption):
+        self.caption = caption
+        self.summary = None
+        self.error = None
+        self.cancelled = False
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Collects concurrent summarization requests into micro-batches and runs them
+    through a single shared Pegasus model on one worker thread.
+
+    Attributes:
+        max_batch_size (int): Largest number of captions generated together.
+        max_wait (float): Seconds to wait for more requests after the first one arrives.
+        max_queue_size (int): Requests beyond this many waiting are rejected.
+    """
+
+    def __init__(self, tokenizer, model, max_batch_size=8, max_wait=0.02, max_queue_size=64):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_queue_size = max_queue_size
+        self.queue = queue.Queue(maxsize=max_queue_size)
+
+        self.lock = threading.Lock()
+        self.requests_total = 0
+        self.rejected_total = 0
+        self.cancelled_total = 0
+        self.batches_total = 0
+        self.batch_sizes = {}
+
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, caption, timeout=None):
+        """Queues a caption and blocks until its summary is generated."""
+        pending = _PendingRequest(caption)
+        with self.lock:
+            self.requests_total += 1
+        try:
+            self.queue.put_nowait(pending)
+        except queue.Full:
+            with self.lock:
+                self.rejected_total += 1
+            raise QueueFullError("Summarization queue is full.")
+
+        if not pending.done.wait(timeout):
+            # The caller has given up, so the worker must not spend a generate call on it
+            pending.cancelled = True
+            with self.lock:
+                self.cancelled_total += 1
+            raise TimeoutError("Timed out waiting for summary.")
+        if pending.error:
+            raise pending.error
+        return pending.summary
+
+    def metrics(self):
+        """Returns queue depth and batch-size counters as a dictionary."""
+        with self.lock:
+            items = sum(size * count for size, count in self.batch_sizes.items())
+            return {
+                "queue_depth": self.queue.qsize(),
+                "max_queue_size": self.max_queue_size,
+                "requests_total": self.requests_total,
+                "rejected_total": self.rejected_total,
+                "cancelled_total": self.cancelled_total,
+                "batches_total": self.batches_total,
+                "avg_batch_size": items / self.batches_total if self.batches_total else 0.0,
+                "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            }
+
+    def _collect_batch(self):
+        """Blocks for the first live request, then gathers more until the window closes."""
+        batch = []
+        while not batch:
+            pending = self.queue.get()
+            if not pending.cancelled:
+                batch.append(pending)
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending = self.queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if not pending.cancelled:
+                batch.append(pending)
+        return batch
+
+    def _generate(self, captions):
+        """Summarizes a list of captions in a single generate call."""
+        inputs = self.tokenizer(captions, return_tensors="pt", max_length=1024, truncation=True, padding=True)
+        summary_ids = self.model.generate(
+            inputs['input_ids'],
+            attention_mask=inputs['attention_mask'],
+            max_length=300,
+            min_length=100,
+            num_beams=4,
+            early_stopping=True
+        )
+        return self.tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+
+    def _run(self):
+        """Worker loop: pulls micro-batches off the queue and answers every request."""
+        while True:
+            # Drop requests whose callers timed out while the batch was being collected
+            batch = [pending for pending in self._collect_batch() if not pending.cancelled]
+            if not batch:
+                continue
+            try:
+                summaries = self._generate([pending.caption for pending in batch])
+                for pending, summary in zip(batch, summaries):
+                    pending.summary = summary
+            except Exception as e:
+                logging.error("Error generating batch of %d summaries: %s", len(batch), e)
+                for pending in batch:
+                    pending.error = e
+            finally:
+                with self.lock:
+                    self.batches_total += 1
+                    self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+                for pending in batch:
+                    pending.done.set()
+
+
+class InferenceRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP handler exposing the shared model.
+
+    POST /summarize  {"caption": "..."}  ->  {"summary": "..."}
+    GET  /metrics                        ->  queue depth and batch-size counters
+    GET  /health                         ->  {"status": "ok"}
+    """
+
+    batcher = None
+    request_timeout = 120
+
+    def do_GET(self):
+        if self.path == "/metrics":
+            self._send_json(200, self.batcher.metrics())
+        elif self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+    def do_POST(self):
+        if self.path != "/summarize":
+            self._send_json(404, {"error": "Not found"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            length = 0
+        # rfile.read() with a negative length blocks until the client closes the socket
+        if length <= 0:
+            self._send_json(400, {"error": "Content-Length must be a positive integer."})
+            return
+        if length > MAX_BODY_SIZE:
+            self._send_json(413, {"error": f"Request body exceeds {MAX_BODY_SIZE} bytes."})
+            return
+
+        try:
+            caption = json.loads(self.rfile.read(length))["caption"]
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {"error": "Expected JSON body with a 'caption' field."})
+            return
+
+        # A bad caption would fail the tokenizer for every request in its micro-batch
+        if not isinstance(caption, str) or not caption.strip():
+            self._send_json(400, {"error": "'caption' must be a non-empty string."})
+            return
+
+        try:
+            summary = self.batcher.submit(caption, timeout=self.request_timeout)
+            self._send_json(200, {"summary": summary})
+        except QueueFullError as e:
+            self._send_json(503, {"error": str(e)})
+        except TimeoutError as e:
+            self._send_json(504, {"error": str(e)})
+        except Exception as e:
+            logging.error("Error summarizing caption: %s", e)
+            self._send_json(500, {"error": str(e)})
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        """Routes request logs through the logging module instead of stderr."""
+        logging.debug("%s - %s", self.address_string(), format % args)
+
+
+def main():
+    setup_logging()
+
+    host = os.environ.get("SUMMARIZER_HOST", "0.0.0.0")
+    port = int(os.environ.get("SUMMARIZER_PORT", "8000"))
+
+    logging.info("Loading %s", MODEL_NAME)
+    tokenizer = PegasusTokenizer.from_pretrained(MODEL_NAME)
+    model = AutoModelForSeq2SeqLM.from_pretrained(MODEL_NAME)
+
+    InferenceRequestHandler.batcher = MicroBatcher(
+        tokenizer,
+        model,
+        max_batch_size=int(os.environ.get("SUMMARIZER_MAX_BATCH_SIZE", "8")),
+        max_wait=float(os.environ.get("SUMMARIZER_MAX_WAIT_MS", "20")) / 1000,
+        max_queue_size=int(os.environ.get("SUMMARIZER_MAX_QUEUE_SIZE", "64")),
+    )
+
+    server = ThreadingHTTPServer((host, port), InferenceRequestHandler)
+    logging.info("Inference server listening on %s:%d", host, port)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,12 @@ import psycopg2
 import requests
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, PegasusTokenizer
 from requests_oauthlib import OAuth1
-import re,logging
+import re,logging,os
 from config import tokens
 from PIL import Image
 from io import BytesIO
 from utils import setup_logging # Import setup_logging from utils
+from inference_client import InferenceClient
 
 class InstagramCaptionSummarizer:
     """
@@ -39,9 +40,16 @@ class InstagramCaptionSummarizer:
         self.POST_TWEET_URL = "https://api.twitter.com/2/tweets"
         self.UPLOAD_MEDIA_URL = "https://upload.twitter.com/1.1/media/upload.json"
 
-        # Initialize the tokenizer and model for caption summarization
-        self.tokenizer = PegasusTokenizer.from_pretrained("google/pegasus-cnn_dailymail")
-        self.model = AutoModelForSeq2SeqLM.from_pretrained("google/pegasus-cnn_dailymail")
+        # Use the shared inference server when configured, otherwise load a local model copy
+        self.SUMMARIZER_URL = os.environ.get("SUMMARIZER_URL")
+        self.client = None
+        self.tokenizer = None
+        self.model = None
+        if self.SUMMARIZER_URL:
+            self.client = InferenceClient(self.SUMMARIZER_URL)
+        else:
+            self.tokenizer = PegasusTokenizer.from_pretrained("google/pegasus-cnn_dailymail")
+            self.model = AutoModelForSeq2SeqLM.from_pretrained("google/pegasus-cnn_dailymail")
 
     def get_latest_post(self):
         """Fetches the latest Instagram post caption and image from the database."""
@@ -56,21 +64,24 @@ class InstagramCaptionSummarizer:
                     post = cursor.fetchone()
                     return post if post else (None, None)
         except Exception as e:
-            logging.error(f"Error fetching post from PostgreSQL: {e}")
+            logging.error("Error fetching post from PostgreSQL: %s", e)
             return (None, None)
 
     def summarize_caption(self, caption):
         """Summarizes the Instagram caption using the pre-trained Pegasus model."""
         try:
-            inputs = self.tokenizer(caption, return_tensors="pt", max_length=1024, truncation=True, padding=True)
-            summary_ids = self.model.generate(
-                inputs['input_ids'],
-                max_length=300,
-                min_length=100,
-                num_beams=4,
-                early_stopping=True
-            )
-            summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+            if self.client:
+                summary = self.client.summarize(caption)
+            else:
+                inputs = self.tokenizer(caption, return_tensors="pt", max_length=1024, truncation=True, padding=True)
+                summary_ids = self.model.generate(
+                    inputs['input_ids'],
+                    max_length=300,
+                    min_length=100,
+                    num_beams=4,
+                    early_stopping=True
+                )
+                summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
 
             # Clean and truncate the summary if needed
             summary = summary.replace('<n>', '').replace('<pad>', '').strip()
@@ -79,8 +90,7 @@ class InstagramCaptionSummarizer:
 
             return summary
         except Exception as e:
-            import logging
-            logging.error(f"Error summarizing caption: {e}")
+            logging.error("Error summarizing caption: %s", e)
             return None
 
     def clean_incomplete_sentence(self, text):
@@ -104,12 +114,10 @@ class InstagramCaptionSummarizer:
             if media_upload.status_code == 200:
                 return media_upload.json()["media_id_string"]
             else:
-                import logging
-                logging.error(f"Failed to upload image: {media_upload.text}")
+                logging.error("Failed to upload image: %s", media_upload.text)
                 return None
         except Exception as e:
-            import logging
-            logging.error(f"Error uploading image from URL: {e}")
+            logging.error("Error uploading image from URL: %s", e)
             return None
 
     def post_tweet(self, tweet_text, image_url=None):
@@ -128,12 +136,10 @@ class InstagramCaptionSummarizer:
             if response.status_code == 201:
                 return response.json()
             else:
-                import logging
-                logging.error(f"Failed to post tweet: {response.text}")
+                logging.error("Failed to post tweet: %s", response.text)
                 return None
         except Exception as e:
-            import logging
-            logging.error(f"Error posting tweet: {e}")
+            logging.error("Error posting tweet: %s", e)
             return None
 
 if __name__ == "__main__":
@@ -0,0 +1,157 @@
+import json
+import socket
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+from unittest.mock import MagicMock
+import requests
+from inference_client import InferenceClient
+from inference_server import MAX_BODY_SIZE, InferenceRequestHandler, MicroBatcher, QueueFullError
+
+def mock_tokenizer_and_model():
+    """Returns a tokenizer and model whose summary of a caption is "summary of <caption>"."""
+    tokenizer = MagicMock()
+    tokenizer.side_effect = lambda captions, **kwargs: {"input_ids": captions, "attention_mask": None}
+    tokenizer.batch_decode.side_effect = lambda ids, **kwargs: [f"summary of {c}" for c in ids]
+    model = MagicMock()
+    model.generate.side_effect = lambda input_ids, **kwargs: input_ids
+    return tokenizer, model
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a MicroBatcher with a mocked tokenizer and model."""
+        self.tokenizer, self.model = mock_tokenizer_and_model()
+
+    def test_submit_returns_summary(self):
+        """Test a single request is summarized and counted."""
+        batcher = MicroBatcher(self.tokenizer, self.model, max_wait=0.01)
+
+        self.assertEqual(batcher.submit("caption", timeout=5), "summary of caption")
+        self.assertEqual(batcher.metrics()["requests_total"], 1)
+
+    def test_concurrent_requests_are_batched(self):
+        """Test concurrent requests are grouped into a single generate call."""
+        batcher = MicroBatcher(self.tokenizer, self.model, max_batch_size=4, max_wait=0.5)
+        results = {}
+
+        def call(i):
+            results[i] = batcher.submit(f"caption {i}", timeout=5)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, {i: f"summary of caption {i}" for i in range(4)})
+        self.assertEqual(self.model.generate.call_count, 1)
+        self.assertEqual(batcher.metrics()["batch_sizes"], {"4": 1})
+
+    def test_full_queue_sheds_load(self):
+        """Test requests are rejected once the queue limit is reached."""
+        release = threading.Event()
+        self.model.generate.side_effect = lambda input_ids, **kwargs: release.wait() and input_ids
+        batcher = MicroBatcher(self.tokenizer, self.model, max_batch_size=1, max_wait=0, max_queue_size=1)
+
+        # One request is held by the worker, the next one fills the queue
+        threading.Thread(target=batcher.submit, args=("busy",), daemon=True).start()
+        while self.model.generate.call_count == 0:
+            release.wait(0.01)
+        threading.Thread(target=batcher.submit, args=("queued",), daemon=True).start()
+        while batcher.metrics()["queue_depth"] == 0:
+            release.wait(0.01)
+
+        with self.assertRaises(QueueFullError):
+            batcher.submit("rejected")
+        self.assertEqual(batcher.metrics()["rejected_total"], 1)
+        release.set()
+
+    def test_timed_out_request_is_not_generated(self):
+        """Test a request whose caller timed out is skipped by the worker."""
+        release = threading.Event()
+        self.model.generate.side_effect = lambda input_ids, **kwargs: release.wait() and input_ids
+        batcher = MicroBatcher(self.tokenizer, self.model, max_batch_size=1, max_wait=0)
+
+        # The first request holds the worker while the second one times out in the queue
+        threading.Thread(target=batcher.submit, args=("busy",), daemon=True).start()
+        while self.model.generate.call_count == 0:
+            release.wait(0.01)
+        with self.assertRaises(TimeoutError):
+            batcher.submit("abandoned", timeout=0.05)
+        release.set()
+
+        self.assertEqual(batcher.submit("next", timeout=5), "summary of next")
+        generated = [call.args[0] for call in self.model.generate.call_args_list]
+        self.assertEqual(generated, [["busy"], ["next"]])
+        self.assertEqual(batcher.metrics()["cancelled_total"], 1)
+
+
+class TestInferenceServer(unittest.TestCase):
+
+    def setUp(self):
+        """Start the HTTP server on a free port with a batcher over a mocked model."""
+        self.batcher = MagicMock(wraps=MicroBatcher(*mock_tokenizer_and_model(), max_wait=0.01))
+        InferenceRequestHandler.batcher = self.batcher
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), InferenceRequestHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        InferenceRequestHandler.batcher = None
+
+    def raw_post(self, content_length, body=b""):
+        """Sends a POST with the given Content-Length header and returns the status line."""
+        with socket.create_connection(self.server.server_address, timeout=3) as conn:
+            conn.sendall(
+                f"POST /summarize HTTP/1.1\r\nHost: localhost\r\nContent-Length: {content_length}\r\n\r\n".encode()
+                + body
+            )
+            return conn.makefile("rb").readline()
+
+    def test_client_summarize_and_metrics(self):
+        """Test InferenceClient round-trips a caption and reads metrics from the real handler."""
+        client = InferenceClient(self.base_url, timeout=5)
+
+        self.assertEqual(client.summarize("caption"), "summary of caption")
+        metrics = client.metrics()
+        self.assertEqual(metrics["requests_total"], 1)
+        self.assertEqual(metrics["batch_sizes"], {"1": 1})
+
+    def test_client_raises_on_overload_and_timeout(self):
+        """Test InferenceClient raises HTTPError for 503 (queue full) and 504 (timeout)."""
+        client = InferenceClient(self.base_url, timeout=5)
+
+        for error, status in ((QueueFullError("full"), 503), (TimeoutError("slow"), 504)):
+            self.batcher.submit.side_effect = error
+            with self.assertRaises(requests.HTTPError) as raised:
+                client.summarize("caption")
+            self.assertEqual(raised.exception.response.status_code, status)
+
+    def test_invalid_caption_is_rejected(self):
+        """Test non-string or empty captions get a 400 without reaching the batcher."""
+        url = f"{self.base_url}/summarize"
+
+        for body in ({"caption": None}, {"caption": 123}, {"caption": ""}, ["caption"]):
+            request = urllib.request.Request(url, data=json.dumps(body).encode(), method="POST")
+            with self.assertRaises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(request)
+            self.assertEqual(error.exception.code, 400)
+        self.batcher.submit.assert_not_called()
+
+    def test_invalid_content_length_is_rejected(self):
+        """Test a negative, zero or oversized Content-Length is answered without reading the body."""
+        body = b'{"caption": "caption"}'
+
+        self.assertIn(b" 400 ", self.raw_post(-1, body))
+        self.assertIn(b" 400 ", self.raw_post(0))
+        self.assertIn(b" 413 ", self.raw_post(MAX_BODY_SIZE + 1))
+        self.batcher.submit.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
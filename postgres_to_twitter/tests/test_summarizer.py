@@ -1,5 +1,10 @@
+import os
+import threading
 import unittest
+from http.server import ThreadingHTTPServer
 from unittest.mock import patch, MagicMock
+from inference_client import InferenceClient
+from inference_server import InferenceRequestHandler, QueueFullError
 from summarizer import InstagramCaptionSummarizer
 
 class TestInstagramCaptionSummarizer(unittest.TestCase):
@@ -31,6 +36,48 @@ class TestInstagramCaptionSummarizer(unittest.TestCase):
         self.assertEqual(cleaned_text, "This is a complete sentence.")
 
 
+class TestInstagramCaptionSummarizerWithServer(unittest.TestCase):
+
+    def setUp(self):
+        """Start an inference server with a mocked batcher and point SUMMARIZER_URL at it."""
+        self.batcher = MagicMock()
+        InferenceRequestHandler.batcher = self.batcher
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), InferenceRequestHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        with patch.dict(os.environ, {"SUMMARIZER_URL": url}), \
+                patch('summarizer.PegasusTokenizer') as self.mock_tokenizer, \
+                patch('summarizer.AutoModelForSeq2SeqLM') as self.mock_model:
+            self.summarizer = InstagramCaptionSummarizer()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        InferenceRequestHandler.batcher = None
+
+    def test_uses_client_instead_of_local_model(self):
+        """Test the model is not loaded when SUMMARIZER_URL is set."""
+        self.assertIsInstance(self.summarizer.client, InferenceClient)
+        self.mock_tokenizer.from_pretrained.assert_not_called()
+        self.mock_model.from_pretrained.assert_not_called()
+
+    def test_summarize_caption_through_server(self):
+        """Test summarize_caption sends the caption to the server and cleans the reply."""
+        self.batcher.submit.return_value = "First sentence.<n> " + "word " * 60 + "cut off"
+
+        summary = self.summarizer.summarize_caption("Instagram caption")
+
+        self.assertEqual(self.batcher.submit.call_args.args[0], "Instagram caption")
+        self.assertEqual(summary, "First sentence.")
+
+    def test_summarize_caption_returns_none_on_server_errors(self):
+        """Test a 503 (queue full) or 504 (timeout) from the server makes summarize_caption return None."""
+        for error in (QueueFullError("full"), TimeoutError("slow")):
+            self.batcher.submit.side_effect = error
+            self.assertIsNone(self.summarizer.summarize_caption("Instagram caption"))
+
+
 if __name__ == '__main__':
     unittest.main()
 
@@ -1,21 +1,168 @@
+import atexit
+import contextvars
+import copy
+import glob
+import json
 import logging
 import os
-from datetime import datetime
+import queue
+import sys
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - [%(correlation_id)s] %(message)s'
+
+_correlation_id = contextvars.ContextVar("correlation_id", default="-")
+_listener = None
+
+
+class CorrelationIdFilter(logging.Filter):
+    """Attaches the current correlation ID to every record on the logging thread."""
+
+    def filter(self, record):
+        record.correlation_id = _correlation_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "correlation_id": getattr(record, "correlation_id", "-"),
+            "message": record.getMessage(),
+        }
+        # Records from the queue carry their traceback in exc_text (see TracebackQueueHandler)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class TracebackQueueHandler(QueueHandler):
+    """
+    Queues records with only msg % args merged and the traceback kept in exc_text.
+    The stock prepare() folds the traceback into msg, which hides it from JsonFormatter.
+    """
+
+    def prepare(self, record):
+        message = record.getMessage()
+        exc_text = record.exc_text
+        if record.exc_info and not exc_text:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+
+        # Drop exc_info as the stock handler does; the traceback object keeps the caller's frames alive
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text
+        return record
+
+
+class DailyFileHandler(logging.FileHandler):
+    """
+    Writes to log_<YYYY-MM-DD>.log for the day each record was created, switching
+    files at midnight and deleting files older than the retention period.
+    """
+
+    def __init__(self, log_dir, retention_days=14, encoding="utf-8"):
+        self.log_dir = log_dir
+        self.retention_days = retention_days
+        self.current_date = date.today()
+        super().__init__(self._path(self.current_date), encoding=encoding)
+        self._delete_old_logs()
+
+    def _path(self, day):
+        return os.path.join(self.log_dir, f"log_{day.strftime('%Y-%m-%d')}.log")
+
+    def emit(self, record):
+        # Errors must not escape, or they would stop the QueueListener thread
+        try:
+            day = date.fromtimestamp(record.created)
+            if day != self.current_date:
+                self._rollover(day)
+        except Exception:
+            self.handleError(record)
+            return
+        super().emit(record)
+
+    def _rollover(self, day):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        self.current_date = day
+        self.baseFilename = os.path.abspath(self._path(day))
+        self.stream = self._open()
+        self._delete_old_logs()
+
+    def _delete_old_logs(self):
+        if not self.retention_days:
+            return
+        cutoff = self.current_date - timedelta(days=self.retention_days)
+        for path in glob.glob(os.path.join(self.log_dir, "log_*.log")):
+            try:
+                day = datetime.strptime(os.path.basename(path), "log_%Y-%m-%d.log").date()
+            except ValueError:
+                continue
+            if day < cutoff:
+                # Other services sharing the log directory may prune the same file
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    sys.stderr.write(f"Could not delete old log file {path}: {e}\n")
+
+
+@contextmanager
+def log_context(correlation_id=None):
+    """Tags all log records inside the block with a correlation ID (generated if not given)."""
+    token = _correlation_id.set(correlation_id or uuid.uuid4().hex[:12])
+    try:
+        yield _correlation_id.get()
+    finally:
+        _correlation_id.reset(token)
+
+
+def setup_logging(log_dir="/app/logs", json_format=None, retention_days=14):
+    """
+    Sets up non-blocking logging: records are put on a queue and a background
+    listener writes them to the console and a daily log file in the specified directory.
+    Set json_format (or LOG_FORMAT=json) for structured output.
+    """
+    global _listener
+    if _listener is not None:
+        return
 
-def setup_logging(log_dir="/app/logs"):
-    """Sets up logging to output logs to a file in the specified directory."""
     if not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
-    log_file = os.path.join(log_dir, f"log_{datetime.today().strftime('%Y-%m-%d')}.log")
+    if json_format is None:
+        json_format = os.environ.get("LOG_FORMAT", "").lower() == "json"
+    formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT)
+
+    handlers = [DailyFileHandler(log_dir, retention_days), logging.StreamHandler()]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = TracebackQueueHandler(log_queue)
+    queue_handler.addFilter(CorrelationIdFilter())
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler(log_file),
-            logging.StreamHandler()
-        ]
-    )
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
 
     logging.info("Logging is set up.")